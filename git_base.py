@@ -1,40 +1,276 @@
 import argparse
+import atexit
+import functools
+import io
+import json
+import mmap
 import os
 import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from xml.etree import ElementTree
 
-from prettytable import PrettyTable
-
 from git_projects import projects, projects_dir
 
+# Resolved once, so child processes don't search PATH for git on every call
+GIT_EXECUTABLE = shutil.which('git') or 'git'
+
 BASE_GIT_CMD = [
-    'git',
+    GIT_EXECUTABLE,
     '-c', 'diff.mnemonicprefix=false',
     '-c', 'core.quotepath=false',
     '--no-optional-locks'
 ]
 
+POM_NAMESPACE = '{http://maven.apache.org/POM/4.0.0}'
+POM_VERSION_TAG = POM_NAMESPACE + 'version'
+POM_ARTIFACT_ID_TAG = POM_NAMESPACE + 'artifactId'
+POM_PARENT_TAG = POM_NAMESPACE + 'parent'
+
+_PATH_SPLIT_RE = re.compile(r'[\\/]+')
+_SNAPSHOT_RE = re.compile(rb'\d+\.\d+-SNAPSHOT')
+# Leading "<major>.<minor>" of a version, with or without a qualifier such as -SNAPSHOT
+_MAJOR_MINOR_RE = re.compile(r'(\d+)\.(\d+)')
+
+# Raw byte scan of a POM for just its version, see _scan_pom_version(); set to False to always use the XML parser
+FAST_POM_VERSION_SCAN = True
+_POM_TAG_RE = re.compile(rb'<!--.*?-->|<\?.*?\?>|<(!\[)?(/?)([^\s>/!?]*)[^>]*?(/?)>', re.DOTALL)
+
+# Never contain a module's own pom.xml, only VCS metadata, IDE config or build output
+POM_SEARCH_SKIP_DIRS = {'target', 'node_modules', '.git', 'build', '.idea'}
+
 parser = argparse.ArgumentParser(description='Configuration parameters.')
 parser.add_argument('--poms', action='store_true', help='Include to output POM file locations.')
 parser.add_argument('--skipversion', action='store_true', help='Skip the version update step of a script.')
 parser.add_argument('--unpulled', action='store_true', help='Count the number of unpulled commits.')
-args = parser.parse_args()
-output_poms = args.poms
-skipversion = args.skipversion
-unpulled = args.unpulled
+parser.add_argument('--jobs', type=int, default=None, help='Number of projects to process in parallel.')
+parser.add_argument('--pretty', action='store_true', help='Render the version status table with PrettyTable.')
+parser.add_argument('--verbose', action='store_true', help='Print every git command before running it.')
+parser.add_argument('--force', action='store_true',
+                    help='Fetch, checkout and pull even when a project is already clean and up to date with origin.')
+parser.add_argument('--cached', action='store_true',
+                    help='Reuse the projects found by the last git_find_projects.py run while the top level of '
+                         'projects_dir is unchanged. Misses repos added inside existing folders.')
+parser.add_argument('--fast-fail', action=argparse.BooleanOptionalAction, default=True,
+                    help='Stop checking projects at the first one that fails a precheck.')
+
+# Set from Config.verbose by init()
+VERBOSE = False
+
+# Seconds a local precheck may take before the project is treated as failed, e.g. one on a dead network share
+GIT_CHECK_TIMEOUT = 30
+
+# Checkout, pull and merge are mostly waiting on origin, but keep the default burst small enough not to hammer it
+MAX_PARALLEL_REMOTE_JOBS = 8
+
+# Branches update_artifact_versions() has a version rule for: dev bumps the minor SNAPSHOT, master drops -SNAPSHOT
+VERSIONED_BRANCHES = {'dev', 'master'}
+
+# Projects found by the last git_find_projects.py run, only reused with --cached
+PROJECTS_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'git_python_utils', 'projects.json')
+
+
+@dataclass
+class Config:
+    output_poms: bool = False
+    skipversion: bool = False
+    unpulled: bool = False
+    jobs: int = None
+    pretty: bool = False
+    verbose: bool = False
+    force: bool = False
+    fast_fail: bool = True
+    cached: bool = False
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_command_line():
+    # sys.argv is parsed once per run. A mistyped flag (e.g. "--skipverison") exits with a usage error
+    # rather than running without it.
+    return parser.parse_args()
+
+
+def parse_args(argv=None):
+    return config_from_args(_parse_command_line() if argv is None else parser.parse_args(argv))
+
+
+def config_from_args(args):
+    # For scripts with their own parser built on top of this one, see git_batch.py
+    return Config(
+        output_poms=args.poms,
+        skipversion=args.skipversion,
+        unpulled=args.unpulled,
+        jobs=args.jobs,
+        pretty=args.pretty,
+        verbose=args.verbose,
+        force=args.force,
+        fast_fail=args.fast_fail,
+        cached=args.cached)
+
+
+_git_sessions = threading.local()
+_open_git_sessions = []
+
+# Per-project lookups that only change when the scripts themselves move HEAD or the work tree.
+# Keyed by the real path of the project dir, cleared through refresh_project_caches() and clear_project_caches().
+_branch_cache = {}
+_project_state_cache = {}
+
+# Ahead/behind are None when the branch has no (existing) upstream
+RepoSnapshot = namedtuple('RepoSnapshot', ['branch', 'upstream', 'ahead', 'behind', 'num_uncommitted_changes'])
+
+
+class GitSession:
+    # Long-running "git cat-file --batch-command" process for one repo, so repeated object lookups
+    # (HEAD, upstream, commit metadata) don't each cost a git fork/exec.
+    # Usable as a context manager to bound the process to one unit of work.
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self._process = None
+        self._config = None
+        # git < 2.36 has no --batch-command; fall back to plain --batch (contents only)
+        self._batch_command = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            BASE_GIT_CMD + ['cat-file', '--batch-command' if self._batch_command else '--batch'],
+            cwd=self.project_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+
+    def _request(self, command, rev):
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+
+        line = f'{command} {rev}\n' if self._batch_command else f'{rev}\n'
+
+        try:
+            self._process.stdin.write(line.encode('utf-8'))
+            self._process.stdin.flush()
+            reply = self._process.stdout.readline()
+        except OSError:
+            reply = b''
+
+        if not reply and self._batch_command:
+            # The process died before answering; assume an old git and retry in --batch mode
+            self.close()
+            self._batch_command = False
+            return self._request(command, rev)
+
+        # Reply is "<sha> <type> <size>\n", or "<rev> missing\n" / "<rev> ambiguous\n"
+        header = reply.decode('utf-8').split()
+        if len(header) != 3:
+            return None
+
+        object_name, object_type, size = header
+        content = None
+        if command == 'contents' or not self._batch_command:
+            content = self._process.stdout.read(int(size) + 1)[:-1]
+
+        return object_name, object_type, content
+
+    def read_object(self, rev):
+        return self._request('contents', rev)
+
+    def resolve(self, rev):
+        # "info" returns only the header, so no object contents are piped back
+        result = self._request('info', rev)
+        return result[0] if result else None
+
+    def config(self):
+        # The repo's effective config, read once with "git config --list -z" until invalidate_config()
+        if self._config is None:
+            returncode, stdout, stderr = _run_git('config', '--list', '-z', cwd=self.project_dir)
+            self._config = {}
+            if returncode == 0:
+                for entry in filter(None, stdout.split('\0')):
+                    key, _, value = entry.partition('\n')
+                    self._config[key] = value
+
+        return self._config
+
+    def invalidate_config(self):
+        self._config = None
+
+    def close(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    self._process.stdin.close()
+                except OSError:
+                    pass
+            self._process.wait()
+        self._process = None
+
+
+def get_git_session(project_dir):
+    sessions = getattr(_git_sessions, 'by_dir', None)
+    if sessions is None:
+        sessions = _git_sessions.by_dir = {}
+
+    session = sessions.get(project_dir)
+    if session is None:
+        session = sessions[project_dir] = GitSession(project_dir)
+        _open_git_sessions.append(session)
+
+    return session
+
+
+def close_git_sessions():
+    for session in _open_git_sessions:
+        session.close()
+
+
+atexit.register(close_git_sessions)
+
+
+def _run_git(*args, cwd=None, echo=False, timeout=None):
+    # Returns (returncode, stdout, stderr) with both outputs stripped; failures are reported through the returncode.
+    # echo marks the user facing commands, which are printed when running with --verbose.
+    git_command = BASE_GIT_CMD + list(args)
+    if echo and VERBOSE:
+        print(' '.join(git_command))
+    try:
+        result = subprocess.run(git_command, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return 1, '', f"'{' '.join(git_command)}' timed out after {timeout} seconds."
+    return result.returncode, result.stdout.strip(), result.stderr.strip()
 
 
+@functools.lru_cache(maxsize=1)
 def is_git_installed():
+    # A git found on PATH at import time needs no "git --version" round-trip
+    if os.path.isabs(GIT_EXECUTABLE):
+        return True
+
     try:
-        subprocess.check_output(["git", "--version"])
+        subprocess.check_output([GIT_EXECUTABLE, "--version"])
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
 
-def init(script_name, list_projects=True):
+def init(script_name, list_projects=True, config=None, print_status=True):
+    global VERBOSE
+
+    config = config or parse_args()
+    VERBOSE = config.verbose
+
     print('-----------------')
     print(script_name)
     print('-----------------')
@@ -45,7 +281,12 @@ def init(script_name, list_projects=True):
         print(f'ERROR: "git" is not installed or accessible from command line.')
         validation_success = False
 
-    if not os.path.isdir(projects_dir):
+    # One directory listing of projects_dir answers "does it exist" for every top level project
+    top_level_dirs = None
+    try:
+        with os.scandir(projects_dir) as entries:
+            top_level_dirs = {os.path.normcase(entry.name) for entry in entries if entry.is_dir()}
+    except OSError:
         print(f'ERROR: Not a valid directory: projects_dir=\"{projects_dir}\"')
         validation_success = False
 
@@ -57,16 +298,24 @@ def init(script_name, list_projects=True):
         else:
             for project in projects:
                 project_dir = get_project_dir(project)
-                if not os.path.isdir(project_dir):
+                project_parts = _PATH_SPLIT_RE.split(project)
+
+                if top_level_dirs is None or len(project_parts) > 1:
+                    # Nested projects still need their own stat
+                    exists = os.path.isdir(project_dir)
+                else:
+                    exists = os.path.normcase(project_parts[0]) in top_level_dirs
+
+                if not exists:
                     print(f'ERROR: Directory does not exist: {project_dir}')
                     validation_success = False
-                elif not os.path.isdir(os.path.join(project_dir, '.git')):
+                elif not os.path.exists(os.path.join(project_dir, '.git')):
                     print(f'ERROR: Directory does not contain a ".git" folder: {project_dir}')
                     validation_success = False
 
     if validation_success:
-        if list_projects:
-            print_version_status()
+        if list_projects and print_status:
+            print_version_status(config)
     else:
         print('Validation failed. Fix validation errors and try again.')
 
@@ -74,39 +323,226 @@ def init(script_name, list_projects=True):
 
 
 def strip_project_dir(repo_dir):
-    return repo_dir.replace(projects_dir + '\\', '').replace(projects_dir + '/', '').replace(projects_dir, '')
+    # Paths outside projects_dir (or on another drive) are returned unchanged
+    try:
+        common_dir = os.path.commonpath([repo_dir, projects_dir])
+    except ValueError:
+        return repo_dir
+
+    if os.path.normcase(common_dir) != os.path.normcase(os.path.normpath(projects_dir)):
+        return repo_dir
+
+    relative_dir = os.path.relpath(repo_dir, projects_dir)
+    return '' if relative_dir == os.curdir else relative_dir
+
+
+def load_cached_projects():
+    # Returns the cached project list, or None when there is none for projects_dir as it is now. Only the mtime of
+    # projects_dir itself is compared, so a repo cloned into an existing folder (e.g. "group/") goes unnoticed.
+    try:
+        mtime_ns = os.stat(projects_dir).st_mtime_ns
+        with open(PROJECTS_CACHE_FILE, encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get('projects_dir') != projects_dir or cache.get('mtime_ns') != mtime_ns:
+        return None
+
+    return cache.get('projects')
+
+
+def save_cached_projects(found_projects):
+    try:
+        cache = {'projects_dir': projects_dir, 'mtime_ns': os.stat(projects_dir).st_mtime_ns,
+                 'projects': found_projects}
+        os.makedirs(os.path.dirname(PROJECTS_CACHE_FILE), exist_ok=True)
+
+        temp_path = PROJECTS_CACHE_FILE + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+        os.replace(temp_path, PROJECTS_CACHE_FILE)
+    except OSError as e:
+        # Only costs the next run a walk
+        print(f'WARNING: Unable to write project cache: {e}', file=sys.stderr)
+
+
+def print_project_header(project_dir):
+    print('-----------------')
+    print(project_dir)
+    print('-----------------')
+
+
+class _ThreadLocalStdout:
+    # Stands in for sys.stdout while projects run in parallel: each worker thread prints into its own buffer,
+    # anything else goes straight through
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def start_buffer(self):
+        self._local.buffer = io.StringIO()
+
+    def stop_buffer(self):
+        output = self._local.buffer.getvalue()
+        self._local.buffer = None
+        return output
 
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (self._stream if buffer is None else buffer).write(text)
 
-def change_dir_to_project(project, quiet=False):
-    project_dir = get_project_dir(project)
-    if not quiet:
-        print('-----------------')
-        print(project_dir)
-        print('-----------------')
-    os.chdir(project_dir)
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self._stream.flush()
 
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
 
+
+def run_projects_in_parallel(worker, jobs=None):
+    # Calls worker(project, project_dir) for every project on a thread pool and returns (successful, failed)
+    # in project order. Each project's output is printed in one piece when it finishes, so logs don't interleave.
+    # Workers must pass project_dir to every git call instead of changing directory.
+    results = [False] * len(projects)
+    if not projects:
+        return [], []
+
+    stdout = sys.stdout
+    thread_stdout = _ThreadLocalStdout(stdout)
+
+    def run(project):
+        thread_stdout.start_buffer()
+        try:
+            project_dir = get_project_dir(project)
+            print_project_header(project_dir)
+            try:
+                # The thread's cat-file process would otherwise outlive it until exit
+                with get_git_session(project_dir):
+                    ok = worker(project, project_dir)
+            except Exception as e:
+                print(f"ERROR: {e}")
+                ok = False
+        finally:
+            output = thread_stdout.stop_buffer()
+        return ok, output
+
+    max_workers = jobs if jobs else min(16, len(projects))
+    sys.stdout = thread_stdout
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(run, project): index for index, project in enumerate(projects)}
+
+            for future in as_completed(futures):
+                ok, output = future.result()
+                stdout.write(output)
+                stdout.flush()
+                results[futures[future]] = ok
+    finally:
+        sys.stdout = stdout
+
+    successful = [project for project, ok in zip(projects, results) if ok]
+    failed = [project for project, ok in zip(projects, results) if not ok]
+    return successful, failed
+
+
+@functools.lru_cache(maxsize=None)
 def get_project_dir(project):
     # Split the input path by either forward slash (/) or backslash (\)
-    project_parts = re.split(r'[\\/]+', project)
+    project_parts = _PATH_SPLIT_RE.split(project)
 
     # Use os.path.join to safely construct the path
     return os.path.join(projects_dir, *project_parts)
 
 
-def get_current_branch():
-    git_command = [
-        'git',
-        'rev-parse',
-        '--abbrev-ref',
-        'HEAD']
-    return subprocess.check_output(git_command).decode('utf-8').strip()
+def _project_cache_key(project_dir):
+    return os.path.realpath(project_dir if project_dir is not None else os.getcwd())
+
+
+def invalidate_branch_cache(project_dir=None):
+    # For callers that know HEAD was switched behind the cache's back
+    _branch_cache.pop(_project_cache_key(project_dir), None)
+
+
+def refresh_project_caches(project_dir=None, branch=None):
+    # Pass branch when the operation is known to leave it checked out (pull, merge, version update)
+    cache_key = _project_cache_key(project_dir)
+    _project_state_cache.pop(cache_key, None)
+
+    if branch is None:
+        invalidate_branch_cache(project_dir)
+    else:
+        _branch_cache[cache_key] = branch
+
+
+def clear_project_caches():
+    # After waiting on the user, who may have switched branches or edited POMs in the meantime
+    _branch_cache.clear()
+    _project_state_cache.clear()
+
+
+def _git_dir(project_dir=None):
+    # The .git folder, or for linked worktrees and submodules the directory named by the "gitdir: <path>" .git file
+    dot_git = os.path.join(project_dir if project_dir is not None else os.getcwd(), '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+
+    try:
+        with open(dot_git, 'r', encoding='utf-8') as file:
+            line = file.readline().strip()
+    except OSError:
+        return None
+
+    if not line.startswith('gitdir: '):
+        return None
+
+    return os.path.join(os.path.dirname(dot_git), line[len('gitdir: '):])
+
+
+def _read_head(project_dir=None):
+    # HEAD of a branch checkout is "ref: refs/heads/<branch>"; anything else (e.g. detached) falls back to git
+    git_dir = _git_dir(project_dir)
+    if git_dir is None:
+        return None
+
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as file:
+            head = file.readline().strip()
+    except OSError:
+        return None
+
+    if head.startswith('ref: refs/heads/'):
+        return head[len('ref: refs/heads/'):]
+
+    return None
+
+
+def get_current_branch(project_dir=None):
+    cache_key = _project_cache_key(project_dir)
+    current_branch = _branch_cache.get(cache_key)
+
+    if current_branch is None:
+        current_branch = _read_head(project_dir)
+
+    if current_branch is None:
+        returncode, current_branch, stderr = _run_git('rev-parse', '--abbrev-ref', 'HEAD', cwd=project_dir)
+
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, 'git rev-parse --abbrev-ref HEAD', stderr=stderr)
+
+    _branch_cache[cache_key] = current_branch
+
+    return current_branch
+
 
+def get_latest_commit_date(project_dir):
+    commit = get_git_session(project_dir).read_object('HEAD')
+    if commit is None:
+        return 'N/A'
 
-def get_latest_commit_date():
-    git_command = BASE_GIT_CMD + ['log', '-1', '--format=%cd', '--date=local']
-    commit_date_str = subprocess.check_output(git_command).decode('utf-8').strip()
-    commit_date = datetime.strptime(commit_date_str, "%a %b %d %H:%M:%S %Y")
+    # Commit header line: "committer <name> <<email>> <epoch seconds> <tz offset>"
+    committer = next(line for line in commit[2].split(b'\n') if line.startswith(b'committer '))
+    commit_date = datetime.fromtimestamp(int(committer.rsplit(b' ', 2)[1]))
     current_date = datetime.now()
     days_since_commit = (current_date - commit_date).days
     formatted_date = commit_date.strftime("%Y-%m-%d %I:%M %p")
@@ -114,8 +550,17 @@ def get_latest_commit_date():
     return formatted_date
 
 
-def print_version_status(exclude_hints_and_notes=False):
-    table = PrettyTable()
+def get_branch_and_commit_date(project_dir, snapshot=None):
+    # The branch comes from the status snapshot (or .git/HEAD) and the date from the cat-file session,
+    # so neither normally costs a git process of its own
+    current_branch = snapshot.branch if snapshot is not None else get_current_branch(project_dir)
+    return current_branch, get_latest_commit_date(project_dir)
+
+
+def print_version_status(config, exclude_hints_and_notes=False):
+    output_poms = config.output_poms
+    unpulled = config.unpulled
+
     fields = [
         "Artifact Id",
         "Version",
@@ -132,325 +577,489 @@ def print_version_status(exclude_hints_and_notes=False):
     if output_poms:
         fields.append("POM")
 
-    table.field_names = fields
-    table.align = "l"
+    rows = []
+    dividers = []
+
+    if unpulled:
+        print('Fetching projects to count unpulled commits')
+        fetch_all_projects_parallel(config.jobs)
 
-    project_index = 1
     num_projects = len(projects)
+    project_results = [None] * num_projects
+    max_workers = config.jobs if config.jobs else min(16, num_projects)
 
-    for project in projects:
-        print(f'[{project_index}/{num_projects}] Retrieving meta for "{project}"')
-        project_index += 1
-        change_dir_to_project(project, quiet=True)
-        project_git_meta = get_project_git_meta(project)
+    # Each project is an independent repo and every git call is given an explicit cwd,
+    # so the metadata can be collected concurrently; the table is still built in order below.
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(collect_project_rows, project, config): index
+                   for index, project in enumerate(projects)}
 
-        index = 0
+        for completed, future in enumerate(as_completed(futures), start=1):
+            project_index = futures[future]
+            project_results[project_index] = future.result()
+            print(f'[{completed}/{num_projects}] Retrieved meta for "{projects[project_index]}"')
 
-        for (artifact_id,
-             artifact_version,
-             num_committed_changes,
-             num_unpushed_commits,
-             num_unpulled_commits,
-             current_branch,
-             latest_commit_date,
-             pom) in project_git_meta:
+    for project_rows, project_dividers in project_results:
+        rows.extend(project_rows)
+        dividers.extend(project_dividers)
 
-            index += 1
+    # Table, hints and notes go out in a single write
+    output = io.StringIO()
 
-            divider = not index < len(project_git_meta)
+    if config.pretty:
+        print(format_pretty_table(fields, rows, dividers), file=output)
+    else:
+        print(format_table(fields, rows, dividers), file=output)
 
-            if not index == 1:
-                latest_commit_date = ''
-                current_branch = ''
+    if not exclude_hints_and_notes:
+        if not output_poms:
+            print('HINT: Provide "--poms" as an argument to print the POM directories. ', file=output)
 
-            row = [
-                artifact_id,
-                artifact_version,
-                num_committed_changes,
-                num_unpushed_commits]
+        if not unpulled:
+            print('HINT: Provide "--unpulled" as an argument to print the number of unpulled commits. (Note: fetches all projects first)', file=output)
 
-            if unpulled:
-                row += [num_unpulled_commits]
+        print('HINT: Provide "--verbose" as an argument to print the git commands being run.', file=output)
+        print('NOTE: If script exits prematurely, run from terminal or try having "Run with Python Console" checked in run config.', file=output)
 
-            row += [
-                current_branch,
-                latest_commit_date]
+    print('', file=output)
+    sys.stdout.write(output.getvalue())
+    sys.stdout.flush()
 
-            if output_poms:
-                row.append(pom)
 
-            table.add_row(row, divider=divider)
+def collect_project_rows(project, config):
+    # Runs on a worker thread; returns the table rows of one project and the divider flag of each
+    output_poms = config.output_poms
+    unpulled = config.unpulled
 
-    print(table)
+    # One cat-file process serves all of this project's lookups and goes away with it
+    with get_git_session(get_project_dir(project)):
+        project_git_meta = get_project_git_meta(project, None, config)
 
-    if not exclude_hints_and_notes:
-        if not output_poms:
-            print('HINT: Provide "--poms" as an argument to print the POM directories. ')
+    rows = []
+    dividers = []
+    index = 0
 
-        if not unpulled:
-            print('HINT: Provide "--unpulled" as an argument to print the number of unpulled commits. (Note: very slow, ~4s per project)')
+    for (artifact_id,
+         artifact_version,
+         num_committed_changes,
+         num_unpushed_commits,
+         num_unpulled_commits,
+         current_branch,
+         latest_commit_date,
+         pom) in project_git_meta:
 
-        print('NOTE: If script exits prematurely, run from terminal or try having "Run with Python Console" checked in run config.')
+        index += 1
 
-    print('')
+        divider = not index < len(project_git_meta)
 
+        if not index == 1:
+            latest_commit_date = ''
+            current_branch = ''
 
-def fetch_branch(branch):
-    try:
-        print(f"-- Fetch '{branch}'")
-        git_command = BASE_GIT_CMD + ['fetch', '--no-tags', 'origin', f'{branch}:{branch}']
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
-        return "fatal" not in output
+        row = [
+            artifact_id,
+            artifact_version,
+            num_committed_changes,
+            num_unpushed_commits]
+
+        if unpulled:
+            row += [num_unpulled_commits]
+
+        row += [
+            current_branch,
+            latest_commit_date]
+
+        if output_poms:
+            row.append(pom)
+
+        rows.append(row)
+        dividers.append(divider)
+
+    return rows, dividers
+
+
+def format_table(fields, rows, dividers):
+    # Left aligned columns sized to their widest cell, with a rule under the header and after each project
+    widths = [max(len(str(cell)) for cell in column) for column in zip(fields, *rows)]
+    rule = '  '.join('-' * width for width in widths)
+
+    lines = ['  '.join(field.ljust(width) for field, width in zip(fields, widths)).rstrip(), rule]
+
+    for row, divider in zip(rows, dividers):
+        lines.append('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
+        if divider:
+            lines.append(rule)
+
+    return '\n'.join(lines)
+
+
+def format_pretty_table(fields, rows, dividers):
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = fields
+    table.align = "l"
+
+    for row, divider in zip(rows, dividers):
+        table.add_row(row, divider=divider)
+
+    return table.get_string()
+
+
+def fetch_branch(branch, project_dir=None):
+    print(f"-- Fetch '{branch}'")
+    returncode, stdout, stderr = _run_git('fetch', '--no-tags', 'origin', f'{branch}:{branch}', cwd=project_dir,
+                                          echo=True)
 
-    except subprocess.CalledProcessError:
+    if returncode != 0:
+        print(stderr)
         print(f"ERROR: Unable to fetch '{branch}'")
         return False
 
+    return True
 
-def count_unpulled_commits(branch=get_current_branch()):
-    try:
-        # Fetch updates from the remote repository
-        git_fetch_command = BASE_GIT_CMD + ['fetch']
-        subprocess.run(git_fetch_command, check=True)
 
-        # Get the number of unpulled commits
-        git_count_command = BASE_GIT_CMD + ['rev-list', '--count', f'{branch}..origin/{branch}']
-        unpulled_commits = subprocess.check_output(git_count_command, text=True).strip()
+def fetch_project(project):
+    returncode, stdout, stderr = _run_git('fetch', '--no-tags', cwd=get_project_dir(project))
 
-        return unpulled_commits
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return "ERR"
+    if returncode != 0:
+        print(f'ERROR: Unable to fetch "{project}": {stderr}')
+        return False
+
+    return True
 
 
-def count_uncommitted_changes():
+def fetch_all_projects_parallel(jobs=None):
+    # One burst of concurrent fetches up front, so counting unpulled commits per project is purely local
+    if not projects:
+        return True
+
+    max_workers = jobs if jobs else min(16, len(projects))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return all(list(executor.map(fetch_project, projects)))
+
+
+def get_repo_snapshot(project_dir=None, timeout=None):
+    # Branch, upstream, ahead/behind and uncommitted change count from a single "git status" call.
+    # The prechecks pass timeout=GIT_CHECK_TIMEOUT; the status table waits for slow repos instead.
+    git_command = BASE_GIT_CMD + ['status', '--branch', '--porcelain=v2']
     try:
-        # Get the list of uncommitted changes
-        git_command = BASE_GIT_CMD + ['status', '--porcelain']
-        result = subprocess.run(git_command, capture_output=True, text=True)
+        result = subprocess.run(git_command, cwd=project_dir, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"Error running git status: timed out after {timeout} seconds.")
+        return None
 
-        # Check for errors
-        if result.returncode != 0:
-            print("Error running git status.")
-            return "ERR"
+    if result.returncode != 0:
+        print("Error running git status.")
+        return None
 
-        # Split the output into lines
-        changes = result.stdout.splitlines()
+    branch = None
+    upstream = None
+    ahead = None
+    behind = None
 
-        # Count the number of changes
-        num_changes = len(changes)
+    output = result.stdout
+    position = 0
 
-        return num_changes
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return "ERR"
+    # The "# " header lines come first; every line after them is one changed or untracked path
+    while output.startswith('# ', position):
+        line_end = output.find('\n', position)
+        if line_end == -1:
+            # Last header without a newline
+            line_end = len(output)
+        line = output[position:line_end]
+        position = line_end + 1
 
+        if line.startswith('# branch.head '):
+            branch = line[len('# branch.head '):]
+        elif line.startswith('# branch.upstream '):
+            upstream = line[len('# branch.upstream '):]
+        elif line.startswith('# branch.ab '):
+            ahead, behind = (abs(int(count)) for count in line[len('# branch.ab '):].split())
 
-def count_unpushed_commits():
-    try:
-        # Get the list of unpushed commits
-        git_command = BASE_GIT_CMD + ['log', '--oneline', '@{u}..HEAD']
-        result = subprocess.run(git_command, capture_output=True, text=True)
+    num_uncommitted_changes = output.count('\n', position)
 
-        # Check for errors
-        if result.returncode != 0:
-            print("Error running git log. Make sure your branch is tracking a remote branch.")
-            return "ERR"
+    # Match "git rev-parse --abbrev-ref HEAD"
+    if branch == '(detached)':
+        branch = 'HEAD'
 
-        # Split the output into lines
-        commits = result.stdout.splitlines()
+    _branch_cache[_project_cache_key(project_dir)] = branch
 
-        # Count the number of commits
-        num_commits = len(commits)
+    return RepoSnapshot(branch, upstream, ahead, behind, num_uncommitted_changes)
 
-        return num_commits
 
-    except subprocess.CalledProcessError as e:
-        print(f"ERROR: {e}")
-        return "ERR"
+def branch_ahead_count(branch, project_dir=None):
+    # Commits on the local branch that origin/<branch> doesn't have, without checking it out; 0 when there is no
+    # local branch, None on error. Compares against the remote refs as of the last fetch.
+    # Plain rev-parse rather than a cat-file session, which would stay open until exit on the calling thread
+    returncode, stdout, stderr = _run_git('rev-parse', '--verify', '--quiet', f'refs/heads/{branch}', cwd=project_dir,
+                                          timeout=GIT_CHECK_TIMEOUT)
+    if returncode != 0:
+        return 0
 
+    returncode, stdout, stderr = _run_git('rev-list', '--count', f'origin/{branch}..refs/heads/{branch}',
+                                          cwd=project_dir, echo=True, timeout=GIT_CHECK_TIMEOUT)
 
-def has_no_changes_in_working_directory():
-    try:
-        print(f"-- Check for changes in working directory")
+    if returncode != 0:
+        print(f"ERROR: {stderr}")
+        return None
 
-        git_command = BASE_GIT_CMD + ['status', '--porcelain']
-        print(' '.join(git_command))
-        output = subprocess.run(git_command, stdout=subprocess.PIPE, text=True).stdout.strip()
+    return int(stdout)
 
-        if output:
-            print(output)
-            print("-----------------")
-            print("ERROR: Changes detected in working directory, stash or revert changes and try again.")
-            return False
 
-        return True
+def preflight_check(branch, project_dir=None, snapshot=None):
+    # Returns (clean, ahead): whether the work tree has no changes, and how many commits branch has that
+    # origin/<branch> doesn't (None on error). Both come from one "git status" when branch is checked out
+    # and tracks origin/<branch>; other branches still need a rev-list.
+    snapshot = snapshot or get_repo_snapshot(project_dir, GIT_CHECK_TIMEOUT)
+    if snapshot is None:
+        return False, None
 
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return False
+    clean = snapshot.num_uncommitted_changes == 0
 
+    if snapshot.branch == branch and snapshot.upstream == f'origin/{branch}' and snapshot.ahead is not None:
+        return clean, snapshot.ahead
 
-def has_no_commits_to_push(branch):
-    try:
-        print(f"-- Check for unpushed commits for '{branch}'")
+    return clean, branch_ahead_count(branch, project_dir)
 
-        git_command = BASE_GIT_CMD + ['rev-list', '--right-only', '--count', f"origin/{branch}...{branch}"]
-        print(' '.join(git_command))
-        result = subprocess.run(git_command, stdout=subprocess.PIPE, text=True).stdout.strip()
 
-        count = int(result)
+def has_no_changes_or_commits_to_push(branches, project_dir=None):
+    print(f"-- Check for changes in working directory and unpushed commits")
+    snapshot = get_repo_snapshot(project_dir, GIT_CHECK_TIMEOUT)
+
+    for branch in branches:
+        clean, count = preflight_check(branch, project_dir, snapshot)
+
+        if not clean:
+            print("ERROR: Changes detected in working directory, stash or revert changes and try again.")
+            return False
+
+        if count is None:
+            return False
 
         if count > 0:
             print(f"There are {count} commits waiting to be pushed to origin/{branch}. Clean up branch and try again.")
             return False
 
-        return True
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return False
+    return True
 
 
-def checkout_branch(branch):
-    try:
-        print(f"-- Checkout '{branch}'")
-        git_command_checkout = BASE_GIT_CMD + ['checkout', branch, '--progress']
-        print(' '.join(git_command_checkout))
-        output = subprocess.check_output(git_command_checkout).decode('utf-8').strip()
-        if "fatal" in output:
-            print(f"ERROR: Unable to checkout '{branch}'")
-            return False
+def get_branch_upstream(branch, project_dir=None):
+    # Same answer as "git rev-parse --abbrev-ref <branch>@{u}", served from the session's config dict
+    session = get_git_session(project_dir or os.getcwd())
+    remote = merge = None
+
+    # A miss may just mean the dict predates a checkout that created the branch with tracking, so reread once
+    for _ in range(2):
+        config = session.config()
+        remote = config.get(f'branch.{branch}.remote')
+        merge = config.get(f'branch.{branch}.merge')
+        if remote and merge:
+            break
+        session.invalidate_config()
+    else:
+        return None
 
-        # Check if the upstream is already set
-        git_command_rev_parse = BASE_GIT_CMD + ['rev-parse', '--abbrev-ref', branch + '@{u}']
-        print(' '.join(git_command_rev_parse))
-        result = subprocess.run(git_command_rev_parse, capture_output=True, text=True)
+    if merge.startswith('refs/heads/'):
+        merge = merge[len('refs/heads/'):]
 
-        if result.returncode == 0:
-            print(f"'{branch}' is tracking '{result.stdout.strip()}'")
-            return True
+    # remote "." means the upstream is another local branch
+    return merge if remote == '.' else f'{remote}/{merge}'
 
-        print(f"'{branch}' is not tracking a remote branch, updating to track 'origin/{branch}'")
 
-        # Ensure the local branch tracks the origin branch
-        git_command_set_upstream = BASE_GIT_CMD + ['branch', '--set-upstream-to=origin/' + branch, branch]
-        print(' '.join(git_command_set_upstream))
-        output = subprocess.check_output(git_command_set_upstream).decode('utf-8').strip()
-        return "fatal" not in output
+def checkout_branch(branch, project_dir=None):
+    print(f"-- Checkout '{branch}'")
+    returncode, stdout, stderr = _run_git('checkout', branch, '--progress', cwd=project_dir, echo=True)
 
-    except subprocess.CalledProcessError:
+    if returncode != 0:
+        print(stderr)
         print(f"ERROR: Unable to checkout '{branch}'")
         return False
 
+    refresh_project_caches(project_dir)
 
-def merge_source_branch_to_destination_branch(source_branch, destination_branch):
-    try:
-        print(f"-- Merge '{source_branch}' to '{destination_branch}'")
-        git_command = BASE_GIT_CMD + ['merge', '--no-ff', source_branch]
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
+    # Check if the upstream is already set
+    upstream = get_branch_upstream(branch, project_dir)
 
-        return "fatal" not in output
+    if upstream is not None:
+        print(f"'{branch}' is tracking '{upstream}'")
+        return True
 
-    except subprocess.CalledProcessError:
-        print(f"ERROR: Unable to merge '{source_branch}' to '{destination_branch}'")
-        print('-- Attempting to resolve merge conflict')
-        git_command = BASE_GIT_CMD + ['checkout', '--theirs', '.']
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
+    print(f"'{branch}' is not tracking a remote branch, updating to track 'origin/{branch}'")
 
-        if "fatal" in output:
-            return False
+    # Ensure the local branch tracks the origin branch
+    returncode, stdout, stderr = _run_git('branch', '--set-upstream-to=origin/' + branch, branch, cwd=project_dir,
+                                          echo=True)
+    get_git_session(project_dir or os.getcwd()).invalidate_config()
 
-        git_command = BASE_GIT_CMD + ['add', '.']
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
+    if returncode != 0:
+        print(stderr)
+        print(f"ERROR: Unable to checkout '{branch}'")
+        return False
 
-        if "fatal" in output:
-            return False
+    return True
 
-        commit_msg = f'"Merged {source_branch} into {destination_branch} and resolved conflict with {source_branch} changes."'
-        git_command = BASE_GIT_CMD + ['commit', '-m', commit_msg]
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
 
-        return "fatal" not in output
+def merge_source_branch_to_destination_branch(source_branch, destination_branch, project_dir=None):
+    print(f"-- Merge '{source_branch}' to '{destination_branch}'")
+    returncode, stdout, stderr = _run_git('merge', '--no-ff', source_branch, cwd=project_dir, echo=True)
+    refresh_project_caches(project_dir, branch=destination_branch)
 
+    if returncode == 0:
+        return True
 
-def amend_commit(commit_msg):
-    try:
-        print(f"-- Amend commit")
-        git_command = BASE_GIT_CMD + ['commit', '-q', '--amend', '-m', commit_msg]
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
-        return "fatal" not in output
+    print(f"ERROR: Unable to merge '{source_branch}' to '{destination_branch}'")
+    print('-- Attempting to resolve merge conflict')
+
+    returncode, stdout, stderr = _run_git('checkout', '--theirs', '.', cwd=project_dir, echo=True)
 
-    except subprocess.CalledProcessError:
-        print(f"ERROR: Unable stage pom.xml")
+    if returncode != 0:
+        print(stderr)
         return False
 
+    returncode, stdout, stderr = _run_git('add', '.', cwd=project_dir, echo=True)
 
-def stage_all_changes():
-    try:
-        print(f"-- Stage all changes")
-        git_command = BASE_GIT_CMD + ['add', '.']
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
-        return "fatal" not in output
+    if returncode != 0:
+        print(stderr)
+        return False
+
+    commit_msg = f'"Merged {source_branch} into {destination_branch} and resolved conflict with {source_branch} changes."'
+    returncode, stdout, stderr = _run_git('commit', '-m', commit_msg, cwd=project_dir, echo=True)
 
-    except subprocess.CalledProcessError:
-        print(f"ERROR: Unable stage pom.xml")
+    if returncode != 0:
+        print(stderr)
         return False
 
+    return True
 
-def pull_branch(branch):
-    try:
-        print(f"-- Pull '{branch}'")
 
-        current_branch = get_current_branch()
-        if current_branch != branch:
-            print(f"ERROR: Pull branch '{branch}' != current branch '{current_branch}'.")
+def amend_commit(commit_msg, project_dir=None):
+    print(f"-- Amend commit")
+    returncode, stdout, stderr = _run_git('commit', '-q', '--amend', '-m', commit_msg, cwd=project_dir, echo=True)
+
+    if returncode != 0:
+        print(stderr)
+        print(f"ERROR: Unable to amend commit")
+        return False
+
+    return True
+
+
+def amend_commit_all(commit_msg, project_dir=None):
+    # Stages changes to tracked files and amends in one call; untracked files are left out
+    print(f"-- Amend commit with all changes")
+    returncode, stdout, stderr = _run_git('commit', '-q', '--amend', '-a', '-m', commit_msg, cwd=project_dir,
+                                          echo=True)
+
+    if returncode != 0:
+        print(stderr)
+        print(f"ERROR: Unable to amend commit")
+        return False
+
+    return True
+
+
+def pull_branch(branch, project_dir=None):
+    print(f"-- Pull '{branch}'")
+
+    # Guard with what HEAD says now rather than what was cached
+    invalidate_branch_cache(project_dir)
+    current_branch = get_current_branch(project_dir)
+    if current_branch != branch:
+        print(f"ERROR: Pull branch '{branch}' != current branch '{current_branch}'.")
+        return False
+
+    if branch != 'dev' and branch != 'master':
+        returncode, stdout, stderr = _run_git('ls-remote', '--heads', '--exit-code', 'origin',
+                                              f'refs/heads/{current_branch}', cwd=project_dir)
+
+        if returncode != 0:
+            print(f"ERROR: No origin in remote for '{branch}'")
             return False
 
-        if branch != 'dev' and branch != 'master':
-            try:
-                subprocess.run([
-                    'git',
-                    'ls-remote',
-                    '--heads',
-                    '--exit-code',
-                    'origin',
-                    f'refs/heads/{current_branch}'])
-
-            except subprocess.CalledProcessError:
-                print(f"ERROR: No origin in remote for '{branch}'")
-                return False
-
-        git_command = BASE_GIT_CMD + ['pull', '--rebase', 'origin', branch]
-        print(' '.join(git_command))
-        output = subprocess.check_output(git_command).decode('utf-8').strip()
-        return "fatal" not in output
+    returncode, stdout, stderr = _run_git('pull', '--rebase', 'origin', branch, cwd=project_dir, echo=True)
+    refresh_project_caches(project_dir, branch=branch if returncode == 0 else None)
 
-    except subprocess.CalledProcessError:
+    if returncode != 0:
+        print(stderr)
         print(f"ERROR: Unable to pull '{branch}'.")
         return False
 
+    return True
+
+
+def fetch_branches(branches, project_dir=None):
+    # One round trip to origin for all the branches; updates their origin/<branch> refs
+    print(f"-- Fetch {', '.join(repr(branch) for branch in branches)}")
+    returncode, stdout, stderr = _run_git('fetch', '--no-tags', 'origin', *branches, cwd=project_dir, echo=True)
+
+    if returncode != 0:
+        print(stderr)
+        print(f"ERROR: Unable to fetch {', '.join(repr(branch) for branch in branches)}")
+        return False
+
+    return True
+
+
+def checkout_and_fast_forward_branch(branch, project_dir=None):
+    # Local counterpart of fetch_and_checkout_and_pull_branch() for after fetch_branches()
+    current_branch = get_current_branch(project_dir)
+
+    if current_branch != branch:
+        if not checkout_branch(branch, project_dir):
+            return False
+
+        if get_current_branch(project_dir) != branch:
+            print(f"ERROR: Could not checkout '{branch}'.")
+            return False
 
-def fetch_and_checkout_and_pull_branch(branch):
+    print(f"-- Fast-forward '{branch}' to 'origin/{branch}'")
+    returncode, stdout, stderr = _run_git('merge', '--ff-only', f'origin/{branch}', cwd=project_dir, echo=True)
+    refresh_project_caches(project_dir, branch=branch)
+
+    if returncode != 0:
+        print(stderr)
+        print(f"ERROR: Unable to fast-forward '{branch}' to 'origin/{branch}'.")
+        return False
+
+    return True
+
+
+def is_up_to_date_with_origin(branch, project_dir=None):
+    # True when the branch is checked out, the work tree is clean and HEAD is the commit origin has for it
+    snapshot = get_repo_snapshot(project_dir)
+    if snapshot is None or snapshot.branch != branch or snapshot.num_uncommitted_changes:
+        return False
+
+    # One round trip to the remote instead of a fetch and a pull
+    returncode, stdout, stderr = _run_git('ls-remote', '--heads', '--exit-code', 'origin', f'refs/heads/{branch}',
+                                          cwd=project_dir)
+    if returncode != 0 or not stdout:
+        return False
+
+    remote_sha = stdout.split()[0]
+    return get_git_session(project_dir or os.getcwd()).resolve('HEAD') == remote_sha
+
+
+def fetch_and_checkout_and_pull_branch(branch, project_dir=None, force=False):
     print("-- Detecting current branch")
-    current_branch = get_current_branch()
+
+    if not force and is_up_to_date_with_origin(branch, project_dir):
+        print(f"Current branch is already '{branch}' and matches 'origin/{branch}', skipping fetch, checkout and pull.")
+        return True
+
+    current_branch = get_current_branch(project_dir)
 
     if current_branch != branch:
         print(f"Current branch is '{current_branch}', performing checkout of '{branch}'.")
 
-        if not fetch_branch(branch):
+        if not fetch_branch(branch, project_dir):
             return False
 
-        if not checkout_branch(branch):
+        if not checkout_branch(branch, project_dir):
             return False
 
-        current_branch = get_current_branch()
+        current_branch = get_current_branch(project_dir)
 
         if current_branch != branch:
             print(f"ERROR: Could not checkout '{branch}'.")
@@ -458,72 +1067,206 @@ def fetch_and_checkout_and_pull_branch(branch):
 
     else:
         print(f"Current branch is already '{branch}', skipping checkout.")
-        return pull_branch(branch)
+        return pull_branch(branch, project_dir)
 
     return True
 
 
-def find_pom_files(directory):
+def _walk_pom_files(directory):
+    # Same top-down order as os.walk (a directory's own pom.xml before its subdirectories), but the stat
+    # comes from the scandir entry so read_pom() can key its cache without another syscall.
+    subdirs = []
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in POM_SEARCH_SKIP_DIRS:
+                        subdirs.append(entry.path)
+                elif entry.name == 'pom.xml':
+                    yield entry.path, entry.stat()
+    except OSError:
+        return
+
+    for subdir in subdirs:
+        yield from _walk_pom_files(subdir)
+
+
+def _list_git_pom_files(directory, tracked_only=False):
+    # Tracked and untracked-but-not-ignored POMs straight from the index, so git's ignore rules replace the walk.
+    # Returns None when git can't answer (e.g. not a repository).
+    untracked = [] if tracked_only else ['--others', '--exclude-standard']
+    returncode, stdout, stderr = _run_git('ls-files', '-z', '--cached', *untracked, '--', 'pom.xml', '*/pom.xml',
+                                          cwd=directory)
+    if returncode != 0:
+        return None
+
     pom_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file == "pom.xml":
-                pom_files.append(os.path.join(root, file))
+    # Parent POMs before their modules, like the top-down walk
+    for relative_path in sorted(set(filter(None, stdout.split('\0'))), key=lambda path: (path.count('/'), path)):
+        if POM_SEARCH_SKIP_DIRS.intersection(relative_path.split('/')[:-1]):
+            continue
+
+        pom_file_path = os.path.join(directory, *relative_path.split('/'))
+
+        try:
+            pom_files.append((pom_file_path, os.stat(pom_file_path)))
+        except OSError:
+            # Still in the index but deleted from the work tree
+            continue
+
+    return pom_files
+
+
+def find_pom_files(directory, tracked_only=False):
+    # Returns [(pom_file_path, stat)]; with tracked_only, only the POMs git knows about (none outside a repository)
+    pom_files = None
+
+    if os.path.exists(os.path.join(directory, '.git')):
+        pom_files = _list_git_pom_files(directory, tracked_only)
+
+    if pom_files is None:
+        pom_files = [] if tracked_only else list(_walk_pom_files(directory))
+
     return pom_files
 
 
-def get_project_git_meta(project):
+def read_pom(pom_file_path, pom_stat=None):
+    if pom_stat is None:
+        pom_stat = os.stat(pom_file_path)
+    return _parse_pom(pom_file_path, pom_stat.st_mtime_ns, pom_stat.st_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_pom(pom_file_path, mtime_ns, size):
+    # Returns (artifactId, version, parent version) of the top level <project>. Stream parse and stop as soon
+    # as the values are known instead of building the whole tree; mtime and size key the cache so edits re-parse.
+    artifact_id = None
+    version = None
+    parent_version = None
+    depth = 0
+    in_parent = False
+
+    with open(pom_file_path, 'rb') as file:
+        for event, elem in ElementTree.iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 2 and elem.tag == POM_PARENT_TAG:
+                    in_parent = True
+                continue
+
+            if depth == 2:
+                if elem.tag == POM_VERSION_TAG:
+                    version = elem.text
+                elif elem.tag == POM_ARTIFACT_ID_TAG:
+                    artifact_id = elem.text
+                elif elem.tag == POM_PARENT_TAG:
+                    in_parent = False
+
+                # Drop the finished subtree (dependencies, build, ...) right away
+                elem.clear()
+
+                if version is not None and artifact_id is not None:
+                    break
+
+            elif depth == 3 and in_parent and elem.tag == POM_VERSION_TAG:
+                parent_version = elem.text
+
+            depth -= 1
+
+    return artifact_id, version, parent_version
+
+
+@dataclass
+class PomInfo:
+    path: str
+    artifact_id: str
+    version: str
+    is_from_parent: bool
+
+
+@dataclass
+class ProjectState:
+    # The POM scan of one project, shared by the status table, the version update and the commit message
+    project: str
+    project_dir: str
+    pom_files: list
+
+    @classmethod
+    def load(cls, project):
+        project_dir = get_project_dir(project)
+        cache_key = _project_cache_key(project_dir)
+        state = _project_state_cache.get(cache_key)
+
+        if state is None:
+            pom_files = []
+            for pom_file_path, pom_stat in find_pom_files(project_dir):
+                artifact_id, version, parent_version = read_pom(pom_file_path, pom_stat)
+                is_from_parent = version is None and parent_version is not None
+                pom_files.append(PomInfo(pom_file_path, artifact_id, parent_version if is_from_parent else version,
+                                         is_from_parent))
+
+            state = _project_state_cache[cache_key] = cls(project, project_dir, pom_files)
+
+        return state
+
+
+def get_project_git_meta(project, state=None, config=None):
     # current_timestamp_seconds_initial = time.time()
-    project_dir = get_project_dir(project)
-    pom_files = find_pom_files(project_dir)
-    num_uncomitted_changes = str(count_uncommitted_changes())
-    num_unpushed_commits = str(count_unpushed_commits())
-    current_branch = get_current_branch()
+    config = config or Config()
+    state = state or ProjectState.load(project)
+    project_dir = state.project_dir
+    snapshot = get_repo_snapshot(project_dir)
+    current_branch, latest_commit_date = get_branch_and_commit_date(project_dir, snapshot)
+
+    if snapshot is None:
+        num_uncomitted_changes = 'ERR'
+        num_unpushed_commits = 'ERR'
+        num_unpulled_commits = 'ERR'
+    else:
+        num_uncomitted_changes = str(snapshot.num_uncommitted_changes)
 
-    num_unpulled_commits = ''
-    if unpulled:
-        num_unpulled_commits = str(count_unpulled_commits(current_branch))
+        if snapshot.ahead is None:
+            print("Error running git log. Make sure your branch is tracking a remote branch.")
+            num_unpushed_commits = 'ERR'
+            num_unpulled_commits = 'ERR'
+        else:
+            # Behind is relative to the last fetch, done up front by print_version_status when unpulled is set
+            num_unpushed_commits = str(snapshot.ahead)
+            num_unpulled_commits = str(snapshot.behind)
 
-    latest_commit_date = get_latest_commit_date()
+    if not config.unpulled:
+        num_unpulled_commits = ''
 
-    artifact_versions = []
+    # Only the first row of a project shows the branch and commit date, both computed once above
+    if len(current_branch) > 18:
+        current_branch = current_branch[:18] + '...'
 
-    if not pom_files:
-        pom_files = []
+    artifact_versions = []
+    pom_files = state.pom_files
 
     if len(pom_files) < 1:
         print(f"WARN: No 'pom.xml' files found in project dir: '{project_dir}'")
-        pom_files.append('')
+        pom_files = [PomInfo('', None, None, False)]
 
     first = True
-    for pom_file_path in pom_files:
+    for pom in pom_files:
+        pom_file_path = pom.path
         version_tag_text = 'N/A'
         artifact_id_text = None
 
         if pom_file_path != '':
-            tree = ElementTree.parse(pom_file_path)
-            root = tree.getroot()
-            namespaces = {'maven': 'http://maven.apache.org/POM/4.0.0'}
-            version_tag = root.find('maven:version', namespaces)
-
-            if version_tag is not None:
-                version_tag_text = version_tag.text
-            else:
-                version_tag = root.find('maven:parent/maven:version', namespaces)
-
-                if version_tag is not None:
-                    version_tag_text = f"{version_tag.text} (p)"
-
-            if version_tag_text is not None:
-                artifact_id = root.find('maven:artifactId', namespaces)
+            if pom.version is not None:
+                version_tag_text = f"{pom.version} (p)" if pom.is_from_parent else pom.version
 
+            if pom.artifact_id is not None:
                 if not first:
                     nested = '-> '
                     current_branch = ''
                 else:
                     nested = ''
 
-                artifact_id_text = f"{nested}{artifact_id.text}"
+                artifact_id_text = f"{nested}{pom.artifact_id}"
 
         if artifact_id_text is None:
             artifact_id_text = project
@@ -533,8 +1276,6 @@ def get_project_git_meta(project):
             num_unpushed_commits = ''
             num_unpulled_commits = ''
             current_branch = ''
-        else:
-            current_branch = current_branch if len(current_branch) <= 18 else current_branch[:18] + '...'
 
         if pom_file_path is not None:
             pom_file_path = strip_project_dir(pom_file_path)
@@ -554,118 +1295,214 @@ def get_project_git_meta(project):
     return artifact_versions
 
 
-def update_artifact_versions(project):
+def _write_file_atomic(path, data):
+    # Write next to the target and swap it in so an interrupted run never leaves a truncated POM
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.pom-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def update_artifact_versions(project, state=None):
     print(f"-- Update artifact versions")
-    current_branch = get_current_branch()
-    project_dir = get_project_dir(project)
-    pom_files = find_pom_files(project_dir)
+    project_dir = state.project_dir if state else get_project_dir(project)
+    current_branch = get_current_branch(project_dir)
 
-    if not pom_files:
-        pom_files = []
+    # Only tracked POMs are versioned: an untracked one isn't part of the commit being amended
+    tracked_pom_files = find_pom_files(project_dir, tracked_only=True)
+
+    if state is None and current_branch == 'master':
+        # Dropping -SNAPSHOT only needs the POM paths, so skip the XML parse
+        pom_files = [PomInfo(pom_file_path, None, None, False) for pom_file_path, _ in tracked_pom_files]
+    else:
+        state = state or ProjectState.load(project)
+        tracked_paths = {pom_file_path for pom_file_path, _ in tracked_pom_files}
+        pom_files = [pom for pom in state.pom_files if pom.path in tracked_paths]
 
     if len(pom_files) < 1:
         print(f"WARN: No 'pom.xml' files found in project dir: '{project_dir}'")
-        pom_files.append('')
+        pom_files = [PomInfo('', None, None, False)]
+
+    # Version of the first POM after the update, as get_first_artifact_version() would report it;
+    # None when it couldn't be read off the bytes that were written
+    new_version = None
 
     if current_branch == 'dev':
-        for pom_file_path in pom_files:
+        # Modules usually share one version, so compile each pattern once per run
+        version_patterns = {}
+
+        def update_version(x):
+            existing_version = x.group(0).decode()
+            match = _MAJOR_MINOR_RE.match(existing_version)
+            if match is None:
+                # e.g. "${revision}" or "RELEASE"
+                print(f'WARN: Version "{existing_version}" in "{pom_file_path}" has no <major>.<minor>, leaving it as is')
+                return x.group(0)
+
+            major, minor = match.groups()
+            new_version = f"{major}.{int(minor) + 1}-SNAPSHOT"
+            print(f'Replacing version "{existing_version}" with "{new_version}"')
+            return new_version.encode()
+
+        for pom in pom_files:
+            pom_file_path = pom.path
             version_tag_text = None
 
             if pom_file_path != '':
-                tree = ElementTree.parse(pom_file_path)
-                root = tree.getroot()
-                namespaces = {'maven': 'http://maven.apache.org/POM/4.0.0'}
-                version_tag = root.find('maven:version', namespaces)
-
-                if version_tag is not None:
-                    version_tag_text = version_tag.text
-                else:
-                    version_tag = root.find('maven:parent/maven:version', namespaces)
-
-                    if version_tag is not None:
-                        version_tag_text = version_tag.text
+                version_tag_text = pom.version
 
             if version_tag_text is not None:
-                pattern = version_tag_text.replace('.', '\\.')
-
-                with open(pom_file_path, 'r') as file:
-                    content = file.read()
+                pattern = version_patterns.get(version_tag_text)
+                if pattern is None:
+                    pattern = version_patterns[version_tag_text] = re.compile(re.escape(version_tag_text.encode()))
 
-                def update_version(x):
-                    existing_version = x.group(0)
-                    major, minor = map(int, existing_version.split('.'))
-                    new_version = f"{major}.{minor + 1}-SNAPSHOT"
-                    print(f'Replacing version "{existing_version}" with "{new_version}"')
-                    return new_version
+                content = Path(pom_file_path).read_bytes()
+                modified_content = content
+                if version_tag_text.encode() in content:
+                    modified_content, replacements = pattern.subn(update_version, content)
 
-                modified_content = re.sub(pattern, update_version, content)
+                if pom is pom_files[0]:
+                    new_version = _scan_pom_bytes(modified_content)
 
-                with open(pom_file_path, 'w') as file:
-                    file.write(modified_content)
+                if modified_content != content:
+                    _write_file_atomic(pom_file_path, modified_content)
 
     if current_branch == 'master':
-        for pom_file_path in pom_files:
+        def release_version(x):
+            existing_version = x.group(0).decode()
+            new_version = existing_version.replace('-SNAPSHOT', '')
+            print(f'Replacing version "{existing_version}" with "{new_version}"')
+            return new_version.encode()
+
+        for pom in pom_files:
+            pom_file_path = pom.path
             print(f'Processing "{pom_file_path}"')
             if pom_file_path != '':
-                with open(pom_file_path, 'r') as file:
-                    content = file.read()
+                content = Path(pom_file_path).read_bytes()
+                modified_content = content
+                if b'-SNAPSHOT' in content:
+                    modified_content, replacements = _SNAPSHOT_RE.subn(release_version, content)
 
-                def update_version(x):
-                    existing_version = x.group(0)
-                    new_version = existing_version.replace('-SNAPSHOT', '')
-                    print(f'Replacing version "{existing_version}" with "{new_version}"')
-                    return new_version
+                if pom is pom_files[0]:
+                    new_version = _scan_pom_bytes(modified_content)
 
-                pattern = r'\d+\.\d+-SNAPSHOT'
-                modified_content = re.sub(pattern, update_version, content)
+                if modified_content != content:
+                    _write_file_atomic(pom_file_path, modified_content)
 
-                with open(pom_file_path, 'w') as file:
-                    file.write(modified_content)
+    # The cached POM scan no longer matches the rewritten files
+    refresh_project_caches(project_dir, branch=current_branch)
 
-    return True
+    return True, new_version
 
 
-def get_first_artifact_version(project):
-    current_branch = get_current_branch()
-    project_dir = get_project_dir(project)
-    pom_files = find_pom_files(project_dir)
+def _scan_pom_version(pom_file_path):
+    # Walk the tags of the mmap'd POM just far enough to find the top level <version> (or <parent><version>),
+    # without decoding or building any XML tree. Returns None when unsure so the caller parses the file instead.
+    with open(pom_file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
 
-    if not pom_files:
-        pom_files = []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as pom:
+            return _scan_pom_bytes(pom)
 
-    if len(pom_files) < 1:
-        print(f"WARN: No 'pom.xml' files found in project dir: '{project_dir}'")
-        pom_files.append('')
 
-    for pom_file_path in pom_files:
-        if pom_file_path != '':
-            tree = ElementTree.parse(pom_file_path)
-            root = tree.getroot()
-            namespaces = {'maven': 'http://maven.apache.org/POM/4.0.0'}
-            version_tag = root.find('maven:version', namespaces)
+def _scan_pom_bytes(pom):
+    # The tag walk behind _scan_pom_version(), for POM content already in memory (bytes or mmap)
+    root = pom.find(b'<project')
+    if root < 0:
+        return None
+
+    depth = 0
+    in_parent = False
+    parent_version = None
+
+    for match in _POM_TAG_RE.finditer(pom, root):
+        cdata, closing, name, self_closing = match.groups()
+
+        if cdata or name == b'':
+            return None
 
-            if version_tag is not None:
-                return version_tag.text
-            else:
-                version_tag = root.find('maven:parent/maven:version', namespaces)
+        if name is None or self_closing:
+            continue
 
-                if version_tag is not None:
-                    return version_tag.text
+        if closing:
+            depth -= 1
+            if depth == 1:
+                in_parent = False
+            elif depth < 1:
+                break
+            continue
+
+        depth += 1
+
+        if name == b'version' and (depth == 2 or (depth == 3 and in_parent)):
+            end = pom.find(b'</version>', match.end())
+            if end < 0:
+                return None
+
+            version = pom[match.end():end].strip().decode('utf-8')
+            if depth == 2:
+                return version
+
+            parent_version = version
+        elif name == b'parent' and depth == 2:
+            in_parent = True
+
+    return parent_version
+
+
+def get_first_artifact_version(project, state=None):
+    state = state or _project_state_cache.get(_project_cache_key(get_project_dir(project)))
+
+    if state is None and FAST_POM_VERSION_SCAN:
+        # Nothing parsed for this project yet, byte-scan the POMs instead of building its ProjectState
+        project_dir = get_project_dir(project)
+        pom_files = find_pom_files(project_dir)
+
+        if len(pom_files) < 1:
+            print(f"WARN: No 'pom.xml' files found in project dir: '{project_dir}'")
+
+        for pom_file_path, pom_stat in pom_files:
+            version = _scan_pom_version(pom_file_path)
+
+            if version is None:
+                artifact_id, version, parent_version = read_pom(pom_file_path, pom_stat)
+                version = version if version is not None else parent_version
+
+            if version is not None:
+                return version
+
+        return "N/A"
+
+    state = state or ProjectState.load(project)
+
+    if len(state.pom_files) < 1:
+        print(f"WARN: No 'pom.xml' files found in project dir: '{state.project_dir}'")
+
+    for pom in state.pom_files:
+        if pom.version is not None:
+            return pom.version
 
     return "N/A"
 
 
-def print_successful_and_failed(successful, failed):
+def print_successful_and_failed(successful, failed, config):
+    # The summary goes out in one write rather than a print per line
+    lines = []
     if successful and len(successful) > 0:
-        print('-----------------')
-        print('Successful')
-        print('-----------------')
-        print('\n'.join(successful))
+        lines += ['-----------------', 'Successful', '-----------------'] + successful
     if failed and len(failed) > 0:
-        print('-----------------')
-        print('Failed')
-        print('-----------------')
-        print('\n'.join(failed))
-    print('-----------------')
-    print_version_status(exclude_hints_and_notes=True)
+        lines += ['-----------------', 'Failed', '-----------------'] + failed
+    lines.append('-----------------')
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+    print_version_status(config, exclude_hints_and_notes=True)
     print('DONE.')
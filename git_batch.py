@@ -0,0 +1,68 @@
+import argparse
+
+import git_checkout
+import git_enable_common_config
+import git_merge
+import git_pull
+import version_status
+from git_base import clear_project_caches, config_from_args, init, parser
+
+# Runs several of the scripts back to back in one Python process, with a single init() and confirmation,
+# e.g. "python git_batch.py enable-config pull status"
+OPERATIONS = {
+    'enable-config': git_enable_common_config.main,
+    'status': version_status.main,
+    'checkout': git_checkout.main,
+    'pull': git_pull.main,
+    'merge': git_merge.main,
+}
+
+# Operations that end by printing the version status table
+PRINTS_STATUS = {'status', 'checkout', 'pull', 'merge'}
+
+# Inherits the shared flags so that e.g. "--jobs 4" isn't mistaken for an operation
+batch_parser = argparse.ArgumentParser(description='Run several GIT scripts in one go.', parents=[parser],
+                                       conflict_handler='resolve')
+batch_parser.add_argument('operations', nargs='+', choices=list(OPERATIONS), help='Operations to run, in order.')
+
+
+def main():
+    args = batch_parser.parse_args()
+    operations = args.operations
+    config = config_from_args(args)
+
+    # Only enable-config works without the project list
+    list_projects = any(operation != 'enable-config' for operation in operations)
+    # A "status" operation prints the table itself, so init() doesn't print it as well
+    if not init('GIT Batch', list_projects=list_projects, config=config, print_status='status' not in operations):
+        return 1
+
+    continue_answer = input(f"Do you want to run {', '.join(operations)}? (Y/N) ").strip().upper()
+    if continue_answer != 'Y':
+        return 0
+
+    # Branches may have been switched while the prompts were waiting
+    clear_project_caches()
+
+    status_printed = False
+
+    for operation in operations:
+        print('-----------------')
+        print(f'[{operation}]')
+
+        if operation == 'status' and status_printed:
+            print('Version status was printed by the previous operation.')
+            continue
+
+        exit_code = OPERATIONS[operation](config, batch=True)
+        if exit_code:
+            print(f'ERROR: "{operation}" failed, skipping the remaining operations.')
+            return exit_code
+
+        status_printed = operation in PRINTS_STATUS
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -1,24 +1,32 @@
-from git_base import change_dir_to_project, fetch_and_checkout_and_pull_branch, init, print_successful_and_failed, projects
+from git_base import MAX_PARALLEL_REMOTE_JOBS, clear_project_caches, fetch_and_checkout_and_pull_branch, init, \
+    parse_args, print_successful_and_failed, run_projects_in_parallel
 
-if not init('GIT Checkout'):
-    exit(1)
 
-continue_answer = input("Do you want to continue? (Y/N) ").strip().upper()
-if continue_answer != 'Y':
-    exit(0)
+def main(config=None, batch=False):
+    # batch: called from git_batch.py, which has already run init() and asked to continue
+    config = config or parse_args()
 
-print('-----------------')
-destination_branch = input("Enter Destination Branch: ").strip()
+    if not batch:
+        if not init('GIT Checkout', config=config):
+            return 1
 
-successful = []
-failed = []
+        continue_answer = input("Do you want to continue? (Y/N) ").strip().upper()
+        if continue_answer != 'Y':
+            return 0
 
-for project in projects:
-    change_dir_to_project(project)
+    print('-----------------')
+    destination_branch = input("Enter Destination Branch: ").strip()
+    # Branches may have been switched while the prompts were waiting
+    clear_project_caches()
 
-    if not fetch_and_checkout_and_pull_branch(destination_branch):
-        failed.append(project)
-    else:
-        successful.append(project)
+    def checkout_project(project, project_dir):
+        return fetch_and_checkout_and_pull_branch(destination_branch, project_dir, config.force)
 
-print_successful_and_failed(successful, failed)
+    successful, failed = run_projects_in_parallel(checkout_project, config.jobs or MAX_PARALLEL_REMOTE_JOBS)
+
+    print_successful_and_failed(successful, failed, config)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
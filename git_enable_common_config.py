@@ -1,37 +1,44 @@
 import subprocess
 
-from git_base import init
+from git_base import GIT_EXECUTABLE, init
 
-if not init('GIT Enable Common Config', list_projects=False):
-    exit(1)
 
-# Check current Git configuration for pull.rebase and rebase.autoStash
-try:
-    pull_rebase_output = subprocess.check_output(
-        ["git", "config", "--global", "--get", "pull.rebase"]).strip().decode()
-except subprocess.CalledProcessError as e:
-    pull_rebase_output = "false"
+def main(config=None, batch=False):
+    # batch: called from git_batch.py, which has already run init()
+    if not batch and not init('GIT Enable Common Config', list_projects=False, config=config):
+        return 1
 
-try:
-    auto_stash_output = subprocess.check_output(
-        ["git", "config", "--global", "--get", "rebase.autoStash"]).strip().decode()
-except subprocess.CalledProcessError as e:
-    auto_stash_output = "false"
+    # Read the whole global configuration once: "-z" separates entries with NUL and each key from its value with a newline
+    result = subprocess.run([GIT_EXECUTABLE, "config", "--global", "--list", "-z"], capture_output=True, text=True)
+
+    global_config = {}
+    if result.returncode == 0:
+        for entry in filter(None, result.stdout.split('\0')):
+            key, _, value = entry.partition('\n')
+            global_config[key] = value
+
+    # git lowercases section and variable names in --list output
+    pull_rebase_output = global_config.get("pull.rebase", "false")
+    auto_stash_output = global_config.get("rebase.autostash", "false")
 
-try:
     if pull_rebase_output.lower() != "true":
         print('Setting "pull.rebase" to "true".')
-        subprocess.check_call(["git", "config", "--global", "pull.rebase", "true"])
+        result = subprocess.run([GIT_EXECUTABLE, "config", "--global", "pull.rebase", "true"])
+        if result.returncode != 0:
+            print(f'ERROR: Was unable to enable git "pull.rebase".')
     else:
         print('"pull.rebase" already set to "true".')
-except subprocess.CalledProcessError as e:
-    print(f'ERROR: Was unable to enable git "pull.rebase".')
 
-try:
     if auto_stash_output.lower() != "true":
         print('Setting "rebase.autoStash" to "true".')
-        subprocess.check_call(["git", "config", "--global", "rebase.autoStash", "true"])
+        result = subprocess.run([GIT_EXECUTABLE, "config", "--global", "rebase.autoStash", "true"])
+        if result.returncode != 0:
+            print(f'ERROR: Was unable to enable git "rebase.autoStash".')
     else:
         print('"rebase.autoStash" already set to "true".')
-except subprocess.CalledProcessError as e:
-    print(f'ERROR: Was unable to enable git "pull.rebase".')
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
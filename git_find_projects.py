@@ -1,25 +1,74 @@
 import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from git_base import init, projects_dir, strip_project_dir
+from git_base import init, load_cached_projects, parse_args, projects_dir, save_cached_projects, strip_project_dir
+
+# Dependency and IDE folders that never hold a checked-out project. Unlike the POM search, build output folders
+# such as "target" and "build" are still walked, since a repo may live there.
+REPO_SEARCH_SKIP_DIRS = {'node_modules', '.idea'}
 
 if not init('GIT Find Projects', list_projects=False):
     exit(1)
 
-repos = []
-for root, dirs, files in os.walk(projects_dir):
-    if '.git' in dirs:
-        repos.append(root)
-        dirs[:] = []
-    else:
-        for subdir in dirs:
-            for subroot, subdirs, subfiles in os.walk(subdir):
-                if '.git' in subdirs:
-                    repos.append(subroot)
-                    # Prevents diving deeper into subdirectories once .git is found
-                    subdirs[:] = []
-                    dirs[:] = []
-
-for repo in repos:
-    repo_dir = strip_project_dir(repo)
-    repo_dir = repo_dir.replace('\\', '\\\\')
-    print(f"'{repo_dir}',")
+
+def scan_dir(path):
+    # Returns (is_repo, subdirs) for one directory; a repo's subdirectories are never descended into
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.name == '.git':
+                    return True, []
+                if entry.name not in REPO_SEARCH_SKIP_DIRS:
+                    subdirs.append(entry.path)
+    except OSError:
+        pass
+
+    return False, subdirs
+
+
+def find_repos(root):
+    # Directory listings are syscall bound, so several run at once; each finished scan queues its subdirectories.
+    # Repos are yielded as they are found, in no particular order.
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        pending = {executor.submit(scan_dir, root): root}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                path = pending.pop(future)
+                is_repo, subdirs = future.result()
+
+                if is_repo:
+                    yield path
+
+                for subdir in subdirs:
+                    pending[executor.submit(scan_dir, subdir)] = subdir
+
+
+found_projects = load_cached_projects() if parse_args().cached else None
+
+if found_projects is not None:
+    # repr() gives a valid Python string literal for git_projects.py, escaping backslashes and quotes alike
+    sys.stdout.writelines(f"{project!r},\n" for project in found_projects)
+else:
+    found_projects = []
+
+    # Written in batches of 64 lines while the walk is still running
+    lines = []
+    for repo in find_repos(projects_dir):
+        project = strip_project_dir(repo)
+        found_projects.append(project)
+        lines.append(f"{project!r},\n")
+
+        if len(lines) == 64:
+            sys.stdout.writelines(lines)
+            sys.stdout.flush()
+            lines = []
+
+    sys.stdout.writelines(lines)
+    save_cached_projects(found_projects)
@@ -1,104 +1,129 @@
-from git_base import amend_commit, change_dir_to_project, count_uncommitted_changes, count_unpulled_commits, \
-    count_unpushed_commits, fetch_and_checkout_and_pull_branch, get_first_artifact_version, \
-    has_no_changes_in_working_directory, has_no_commits_to_push, init, merge_source_branch_to_destination_branch, \
-    print_successful_and_failed, projects, skipversion, stage_all_changes, update_artifact_versions
-
-if not init('GIT Merge'):
-    exit(1)
-
-if not skipversion:
-    print('HINT: Provide "--skipversion" as an argument to skip POM version updates. ')
-    print('')
-else:
-    print('[--skipversion Detected]: Will skip POM version updates.')
-    print('')
-
-for project in projects:
-    change_dir_to_project(project, True)
-
-    if count_uncommitted_changes():
-        print(f'ERROR: Changes detected in working directory for project: "{project}"')
-        print('Stash or revert changes and try again.')
-        exit(0)
-
-    if count_unpushed_commits():
-        print(f'ERROR: Unpushed commits detected in current branch for project: "{project}"')
-        print('Clean up current branch and try again.')
-        exit(0)
-
-    if count_unpulled_commits():
-        print(f'ERROR: Unpulled commits detected in current branch for project: "{project}"')
-        print('Clean up current branch and try again.')
-        exit(0)
-
-continue_answer = input("Do you want to continue? (Y/N) ").strip().upper()
-if continue_answer != 'Y':
-    exit(0)
-
-print('-----------------')
-
-deployment_ticket = input("Enter Deployment Ticket (e.g. DEV-1234): ").strip()
-source_branch = input("Enter Source Branch: ").strip()
-destination_branch = input("Enter Destination Branch: ").strip()
-
-successful = []
-failed = []
-
-for project in projects:
-    change_dir_to_project(project)
-
-    if not has_no_changes_in_working_directory():
-        failed.append(project)
-        continue
-
-    if not has_no_commits_to_push(source_branch):
-        failed.append(project)
-        continue
-
-    if not has_no_commits_to_push(destination_branch):
-        failed.append(project)
-        continue
-
-if len(failed):
-    print(
-        f'ERROR: The following projects had uncommitted changes or unpushed commits in "{source_branch}" and/or "{destination_branch}".')
-    print('-----------------')
-    print('\n'.join(failed))
-    print('-----------------')
-    print('Clean up projects with errors and try again.')
-    exit(0)
+from git_base import GIT_CHECK_TIMEOUT, MAX_PARALLEL_REMOTE_JOBS, VERSIONED_BRANCHES, amend_commit, amend_commit_all, \
+    checkout_and_fast_forward_branch, clear_project_caches, fetch_all_projects_parallel, fetch_branches, \
+    get_first_artifact_version, get_project_dir, get_repo_snapshot, has_no_changes_or_commits_to_push, init, \
+    merge_source_branch_to_destination_branch, parse_args, print_project_header, print_successful_and_failed, \
+    projects, run_projects_in_parallel, update_artifact_versions
+
+
+def main(config=None, batch=False):
+    # batch: called from git_batch.py, which has already run init() and asked to continue
+    config = config or parse_args()
+
+    if not batch and not init('GIT Merge', config=config):
+        return 1
+
+    if not config.skipversion:
+        print('HINT: Provide "--skipversion" as an argument to skip POM version updates. ')
+        print('')
+    else:
+        print('[--skipversion Detected]: Will skip POM version updates.')
+        print('')
+
+    # The unpushed/unpulled precheck below compares against origin/*, which is only trustworthy after a fetch
+    if not fetch_all_projects_parallel(config.jobs):
+        print('Fix the fetch errors above and try again.')
+        return 1
+
+    for project in projects:
+        # Uncommitted, unpushed and unpulled counts all come from one "git status" against the fetch above
+        snapshot = get_repo_snapshot(get_project_dir(project), GIT_CHECK_TIMEOUT)
+
+        if snapshot is None or snapshot.num_uncommitted_changes:
+            print(f'ERROR: Changes detected in working directory for project: "{project}"')
+            print('Stash or revert changes and try again.')
+            return 1
+
+        if snapshot.ahead is None:
+            print(f'ERROR: Current branch is not tracking a remote branch for project: "{project}"')
+            print('Clean up current branch and try again.')
+            return 1
+
+        if snapshot.ahead:
+            print(f'ERROR: Unpushed commits detected in current branch for project: "{project}"')
+            print('Clean up current branch and try again.')
+            return 1
+
+        if snapshot.behind:
+            print(f'ERROR: Unpulled commits detected in current branch for project: "{project}"')
+            print('Clean up current branch and try again.')
+            return 1
+
+    if not batch:
+        continue_answer = input("Do you want to continue? (Y/N) ").strip().upper()
+        if continue_answer != 'Y':
+            return 0
 
-for project in projects:
-    change_dir_to_project(project)
+    print('-----------------')
 
-    if not fetch_and_checkout_and_pull_branch(source_branch):
-        failed.append(project)
-        continue
+    deployment_ticket = input("Enter Deployment Ticket (e.g. DEV-1234): ").strip()
+    source_branch = input("Enter Source Branch: ").strip()
+    destination_branch = input("Enter Destination Branch: ").strip()
+    # Branches may have been switched while the prompts were waiting
+    clear_project_caches()
 
-    if not fetch_and_checkout_and_pull_branch(destination_branch):
-        failed.append(project)
-        continue
+    failed = []
 
-    if not merge_source_branch_to_destination_branch(source_branch, destination_branch):
-        failed.append(project)
-        continue
+    for project in projects:
+        project_dir = get_project_dir(project)
+        print_project_header(project_dir)
 
-    if not skipversion:
-        if not update_artifact_versions(project):
+        if not has_no_changes_or_commits_to_push([source_branch, destination_branch], project_dir):
             failed.append(project)
-            continue
+            if config.fast_fail:
+                break
 
-        if not stage_all_changes():
-            failed.append(project)
-            continue
+    if len(failed):
+        print(
+            f'ERROR: The following projects had uncommitted changes or unpushed commits in "{source_branch}" and/or "{destination_branch}".')
+        print('-----------------')
+        print('\n'.join(failed))
+        print('-----------------')
+        print('Clean up projects with errors and try again.')
+        return 1
+
+    # Everything but the version is the same for every project
+    msg_prefix = F"{deployment_ticket} Merge '{source_branch}' to '{destination_branch}' ("
+
+    # Other destination branches have no version rule, so their POMs would come out of the update unchanged
+    update_versions = not config.skipversion and destination_branch in VERSIONED_BRANCHES
+
+    def merge_project(project, project_dir):
+        # A single fetch covers both branches; bringing them up to date after that is local only
+        if not fetch_branches([source_branch, destination_branch], project_dir):
+            return False
+
+        if not checkout_and_fast_forward_branch(source_branch, project_dir):
+            return False
+
+        if not checkout_and_fast_forward_branch(destination_branch, project_dir):
+            return False
+
+        if not merge_source_branch_to_destination_branch(source_branch, destination_branch, project_dir):
+            return False
+
+        version = None
+
+        if update_versions:
+            ok, version = update_artifact_versions(project)
+            if not ok:
+                return False
+
+        # The version update already knows the new version; only read the POMs when it was skipped or unsure
+        version = version or get_first_artifact_version(project)
+        commit_message = F"{msg_prefix}{version})"
+
+        if not update_versions:
+            return amend_commit(commit_message, project_dir)
+
+        # update_artifact_versions() leaves untracked POMs alone, so "commit -a" picks up every file it rewrote
+        return amend_commit_all(commit_message, project_dir)
 
-    version = get_first_artifact_version(project)
-    commit_message = F"{deployment_ticket} Merge '{source_branch}' to '{destination_branch}' ({version})"
+    # Every step runs against its own project_dir, so the projects are merged concurrently
+    successful, failed = run_projects_in_parallel(merge_project, config.jobs or MAX_PARALLEL_REMOTE_JOBS)
 
-    if not amend_commit(commit_message):
-        failed.append(project)
-        continue
+    print_successful_and_failed(successful, failed, config)
+    return 1 if failed else 0
 
-    successful.append(project)
 
-print_successful_and_failed(successful, failed)
+if __name__ == '__main__':
+    exit(main())
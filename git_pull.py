@@ -1,23 +1,32 @@
-from git_base import change_dir_to_project, get_current_branch, init, print_successful_and_failed, projects, pull_branch
+from git_base import MAX_PARALLEL_REMOTE_JOBS, clear_project_caches, get_current_branch, init, parse_args, \
+    print_successful_and_failed, pull_branch, run_projects_in_parallel
 
-if not init('GIT Pull'):
-    exit(1)
 
-continue_answer = input("Do you want to continue? (Y/N) ").strip().upper()
-if continue_answer != 'Y':
-    exit(0)
+def main(config=None, batch=False):
+    # batch: called from git_batch.py, which has already run init() and asked to continue
+    config = config or parse_args()
 
-print('-----------------')
+    if not batch:
+        if not init('GIT Pull', config=config):
+            return 1
 
-successful = []
-failed = []
+        continue_answer = input("Do you want to continue? (Y/N) ").strip().upper()
+        if continue_answer != 'Y':
+            return 0
 
-for project in projects:
-    change_dir_to_project(project)
+    # Branches may have been switched while the prompts were waiting
+    clear_project_caches()
 
-    if not pull_branch(get_current_branch()):
-        failed.append(project)
-    else:
-        successful.append(project)
+    print('-----------------')
 
-print_successful_and_failed(successful, failed)
+    def pull_project(project, project_dir):
+        return pull_branch(get_current_branch(project_dir), project_dir)
+
+    successful, failed = run_projects_in_parallel(pull_project, config.jobs or MAX_PARALLEL_REMOTE_JOBS)
+
+    print_successful_and_failed(successful, failed, config)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
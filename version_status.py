@@ -1,4 +1,18 @@
-from git_base import init
+from git_base import init, parse_args, print_version_status
 
-if not init('Version Status'):
-    exit(1)
+
+def main(config=None, batch=False):
+    config = config or parse_args()
+
+    if batch:
+        print_version_status(config)
+        return 0
+
+    if not init('Version Status', config=config):
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())